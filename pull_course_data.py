@@ -1,19 +1,90 @@
-from bs4 import BeautifulSoup
+import aiohttp
+import lxml.html
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv
+import pyarrow.parquet as pq
+from tqdm.auto import tqdm
 import requests
+import requests_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import Select
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions
 from selenium.webdriver.chrome.service import Service
+from selenium.common.exceptions import NoSuchElementException, TimeoutException, WebDriverException
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import re
+import threading
 import time
 import datetime
+import functools
+import hashlib
+import json
 import os
+import random
 
 
-def get_states(base_url='https://ncrdb.usga.org/', returns='state_name_only'):
+_HEADER_RE = re.compile(r'[^a-z0-9]+')
+_COURSEID_RE = re.compile(r'CourseID=(\d+)')
+_WS_RE = re.compile(r'\s+')
+_TEE_HEADER_RE = re.compile(r'[^a-z0-9._/]+')
+_TEE_CELL_RE = re.compile(r'[^a-z0-9./]+')
+STATES_CACHE_TTL = datetime.timedelta(days=7)
+COURSES_CACHE_TTL = datetime.timedelta(days=1)
+REQUEST_TIMEOUT = 10
+CACHE_EXPIRE_AFTER = datetime.timedelta(days=7)
+
+
+def create_session(pool_size=32, cache_name=None):
+    """Create a requests.Session that keeps connections to the host alive and retries failed hits.
+
+    Parameters
+    ----------
+    pool_size : int, default=32
+        Number of connections kept open per host.  Should be at least the number of workers sharing the session.
+    cache_name : str, optional
+        Location of a sqlite response cache.  If given, GET responses are cached for CACHE_EXPIRE_AFTER and revalidated
+        with the ETag/Last-Modified headers sent by the host.
+
+    Returns
+    -------
+    requests.Session or requests_cache.CachedSession
+    """
+    retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(500, 502, 503, 504))
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+    if cache_name is None:
+        session = requests.Session()
+    else:
+        session = requests_cache.CachedSession(cache_name, backend='sqlite', expire_after=CACHE_EXPIRE_AFTER,
+                                               cache_control=True)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+# Shared by all module level hits so connections are reused.  The ASP.NET postback is never cached
+_SESSION = create_session()
+
+
+@functools.lru_cache(maxsize=None)
+def get_cached_session(data_folder='data'):
+    """Get the session that caches course pages in data_folder/usga_cache.sqlite.  One session is created per data_folder."""
+    return create_session(cache_name=os.path.join(data_folder, 'usga_cache'))
+
+
+@functools.lru_cache(maxsize=None)
+def normalize_header(col):
+    """Make a table header sql-like.  Cached since every state pull normalizes the same headers."""
+    return _HEADER_RE.sub('_', col.lower())
+
+
+def get_states(base_url='https://ncrdb.usga.org/', returns='state_name_only', cache_file=None):
     """Get all states and state-ids on the https://ncrdb.usga.org/ webpage.
 	
 	Parameters
@@ -21,6 +92,9 @@ def get_states(base_url='https://ncrdb.usga.org/', returns='state_name_only'):
 	base_url : str, default='https://ncrdb.usga.org/'
 		USGA NCRDB base url. This shouldn't change unless the host changes its base url.
     returns : {'state_name_only', 'state_name_and_id'}, default='state_name_only
+    cache_file : str, optional
+        Location of a json file to cache the states in, e.g. 'data/.states_cache.json'.  The cached states are reused until
+        they are older than STATES_CACHE_TTL.
 
 	Returns
 	-------
@@ -28,104 +102,311 @@ def get_states(base_url='https://ncrdb.usga.org/', returns='state_name_only'):
 		Depends on returns parameter to determine what is returned
     """
 
-    page = requests.get(base_url)
-    soup = BeautifulSoup(page.content, 'html.parser')
-
     state_list = []
-    for opt in soup.find(attrs={'id': 'ddState'}).find_all('option'):
-        if opt.text == '(Select)':
-            continue
-        
+    for state_name, state_id in read_states(base_url, cache_file):
         if returns == 'state_name_only':
-            state_list.append(opt.text)
+            state_list.append(state_name)
         elif returns == 'state_name_and_id':
-            state_list.append((opt.text, opt['value']))
+            state_list.append((state_name, state_id))
         else:
             raise NameError(f'returns=[{returns}] which is not a valid name.')
         
     return state_list
-            
 
-def get_courses_by_state(state, archive=None, driver_loc='/opt/homebrew/bin/chromedriver', base_url='https://ncrdb.usga.org/'):
-    """Get a DataFrame of all the courses in the provided state.  
-    
+
+@functools.lru_cache(maxsize=4)
+def read_states(base_url='https://ncrdb.usga.org/', cache_file=None):
+    """Read the (state_name, state_id) pairs for get_states().  Results are cached for the rest of the process.
+
+	Parameters
+	----------
+	base_url : str, default='https://ncrdb.usga.org/'
+		USGA NCRDB base url. This shouldn't change unless the host changes its base url.
+    cache_file : str, optional
+        Location of a json file to cache the states in.  If it holds states for base_url that are newer than STATES_CACHE_TTL,
+        the webpage is not requested.
+
+	Returns
+	-------
+	tuple of (state_name, state_id)
+    """
+
+    # Use the cached states if they are still fresh
+    cache = {}
+    if cache_file is not None:
+        try:
+            with open(cache_file) as f:
+                cache = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            cache = {}
+
+        entry = cache.get(base_url)
+        if entry is not None and \
+                datetime.datetime.now() - datetime.datetime.fromisoformat(entry['fetched_at']) < STATES_CACHE_TTL:
+            return tuple(tuple(state) for state in entry['states'])
+
+    page = _SESSION.get(base_url, timeout=REQUEST_TIMEOUT)
+    page.raise_for_status()
+
+    # Read the state dropdown straight from the lxml tree
+    tree = lxml.html.fromstring(page.content)
+    options = ((opt.text_content(), opt.get('value')) for opt in tree.xpath('//select[@id="ddState"]/option'))
+    states = tuple((state_name, state_id) for state_name, state_id in options if state_name != '(Select)')
+
+    # Store the states for later processes
+    if cache_file is not None:
+        cache[base_url] = {'fetched_at': datetime.datetime.now().isoformat(), 'states': states}
+        with open(cache_file, 'w+') as f:
+            json.dump(cache, f)
+
+    return states
+
+
+def start_driver(driver_loc='/opt/homebrew/bin/chromedriver'):
+    """Start a headless Chrome webdriver that can be shared across state pulls.
+
     Parameters
     ----------
-    state : str
-        The State/Province that will the courses will be pulled from.  Be sure that the inputted state exists in the get_states()
-        function.
-    archive : pd.DataFrame, optional
-        If this is an incremental pull, input the DataFrame from the last pull to see what the changes are.
     driver_loc : str, default='/opt/homebrew/bin/chromedriver'
-        The local location of your Chrome Driver.  To find the location to but in this field enter the following command:
-        >>> type chromedriver
-        chromedriver is /opt/homebrew/bin/chromedriver
-	base_url : str, default='https://ncrdb.usga.org/'
-		USGA NCRDB base url. This shouldn't change unless the host changes its base url.
+        The local location of your Chrome Driver.
 
     Returns
     -------
-    pd.DataFrame
-        Containing all courses in the listed state or if archive is not None, returns the new and different course instances.
+    webdriver.Chrome
+        Running Chrome webdriver.  The caller is responsible for calling quit() on it.
     """
-    
-    # Initiate webdriver
+    # Run headless without images, fonts, stylesheets or extensions, and hand back control once the DOM is loaded
+    opts = webdriver.ChromeOptions()
+    opts.add_argument('--headless=new')
+    opts.add_argument('--no-sandbox')
+    opts.add_argument('--disable-gpu')
+    opts.add_argument('--disable-extensions')
+    opts.add_argument('--blink-settings=imagesEnabled=false')
+    opts.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2,
+                                           'profile.managed_default_content_settings.stylesheets': 2,
+                                           'profile.managed_default_content_settings.fonts': 2})
+    opts.page_load_strategy = 'eager'
+
     s = Service(driver_loc)
-    driver = webdriver.Chrome(service=s)
+    return webdriver.Chrome(service=s, options=opts)
+
+
+def get_postback_form(session, base_url='https://ncrdb.usga.org/'):
+    """Get the ASP.NET form fields needed to post a state search back to the https://ncrdb.usga.org/ webpage.
+
+    Parameters
+    ----------
+    session : requests.Session
+        Session used to load the page.  The same session must be used to post the form.
+    base_url : str, default='https://ncrdb.usga.org/'
+        USGA NCRDB base url. This shouldn't change unless the host changes its base url.
+
+    Returns
+    -------
+    dict
+        'fields' : dict of the hidden form fields (__VIEWSTATE, __VIEWSTATEGENERATOR, __EVENTVALIDATION, ...)
+        'state_field' : name of the state dropdown field
+        'state_ids' : dict mapping state name to state id
+        'button' : (name, value) of the submit button
+    """
+    page = session.get(base_url, timeout=REQUEST_TIMEOUT)
+    page.raise_for_status()
+    tree = lxml.html.fromstring(page.content)
+
+    fields = {inp.get('name'): inp.get('value', '') for inp in tree.xpath('//input[@type="hidden"][@name]')}
+    select = tree.get_element_by_id('ddState')
+    button = tree.get_element_by_id('myButton')
+
+    return {'fields': fields,
+            'state_field': select.get('name'),
+            'state_ids': {opt.text_content(): opt.get('value') for opt in select.findall('option')},
+            'button': (button.get('name'), button.get('value'))}
+
+
+def get_courses_page(state, session, base_url='https://ncrdb.usga.org/', form=None):
+    """Get the html of the courses page for a state by posting the ASP.NET form directly.
+
+    Parameters
+    ----------
+    state : str
+        The State/Province that will the courses will be pulled from.
+    session : requests.Session
+        Session used to load and post the form.
+    base_url : str, default='https://ncrdb.usga.org/'
+        USGA NCRDB base url. This shouldn't change unless the host changes its base url.
+    form : dict, optional
+        Result of get_postback_form() to reuse.  If None, the form is loaded first, costing an extra request.
+
+    Returns
+    -------
+    bytes
+        Html of the page returned by the postback.
+    """
+    if form is None:
+        form = get_postback_form(session, base_url)
+    if state not in form['state_ids']:
+        raise NameError(f'state=[{state}] is not a valid state name.')
+
+    data = dict(form['fields'])
+    data[form['state_field']] = form['state_ids'][state]
+    data[form['button'][0]] = form['button'][1]
+
+    page = session.post(base_url, data=data, timeout=REQUEST_TIMEOUT)
+    page.raise_for_status()
+    return page.content
+
+
+def get_courses_page_selenium(state, driver, base_url='https://ncrdb.usga.org/'):
+    """Get the html of the courses page for a state by driving the webpage with Selenium.
+
+    Parameters
+    ----------
+    state : str
+        The State/Province that will the courses will be pulled from.
+    driver : webdriver.Chrome
+        Running webdriver from start_driver().
+    base_url : str, default='https://ncrdb.usga.org/'
+        USGA NCRDB base url. This shouldn't change unless the host changes its base url.
+
+    Returns
+    -------
+    str or None
+        Html of the page once the courses table is visible, None if the state has no courses or the table never showed up.
+    """
     driver.get(base_url)
 
     # Select state
     select = Select(driver.find_element('id', 'ddState'))
     select.select_by_visible_text(state)
 
-    # Click submit button and wait for table
+    # Click submit button and wait for either the table or the no records label
     driver.find_element('id', 'myButton').click()
-    tbl_id = 'gvCourses'
     try:
-        WebDriverWait(driver, 10).until(expected_conditions.visibility_of_element_located((By.ID, tbl_id)))
-    except:
-         driver.quit()
-         return None
+        WebDriverWait(driver, 10, poll_frequency=0.1, ignored_exceptions=(NoSuchElementException,)).until(
+            expected_conditions.any_of(expected_conditions.visibility_of_element_located((By.ID, 'gvCourses')),
+                                       expected_conditions.visibility_of_element_located((By.ID, 'lblNoRecords'))))
+    except TimeoutException:
+        return None
 
-    # Get soup of current page
-    new_soup = BeautifulSoup(driver.page_source, 'lxml')
-    driver.quit()
+    # Return early if the state has no courses
+    no_records = driver.find_elements(By.ID, 'lblNoRecords')
+    if no_records and no_records[0].is_displayed():
+        return None
 
-    # Get table object
-    courses_tbl = new_soup.find(attrs={'id': tbl_id})
+    return driver.page_source
 
-    # Get headers
-    headers = ['url', 'course_id', 'last_updated'] + [col.text for col in courses_tbl.find('thead').find_all('div')]
-    headers = [re.sub(r'[^a-z0-9]+', '_', col.lower()) for col in headers]  # make headers sql-like
 
-    if archive is not None:
-        pass
+def build_archive_lookup(archive):
+    """Build the lookups used to compare pulled courses against the archive.
+
+    Parameters
+    ----------
+    archive : pd.DataFrame
+        DataFrame from the last pull.
+
+    Returns
+    -------
+    dict
+        'urls' : set of archived urls
+        'city_by_id' : dict mapping archived course id to city
+    """
+    return {'urls': set(archive['url']),
+            'city_by_id': dict(zip(archive['course_id'], archive['city']))}
+
+
+def get_course_columns_by_state(state, archive=None, driver_loc='/opt/homebrew/bin/chromedriver', base_url='https://ncrdb.usga.org/',
+                                driver=None, session=None, use_selenium=False, form=None):
+    """Get the columns of all the courses in the provided state, without building a DataFrame.
+    
+    Parameters
+    ----------
+    state : str
+        The State/Province that will the courses will be pulled from.  Be sure that the inputted state exists in the get_states()
+        function.
+    archive : pd.DataFrame or dict, optional
+        If this is an incremental pull, input the DataFrame from the last pull to see what the changes are.  The dict returned
+        by build_archive_lookup() can be passed instead to avoid rebuilding the lookups for every state.
+    driver_loc : str, default='/opt/homebrew/bin/chromedriver'
+        The local location of your Chrome Driver.  Only used when use_selenium=True.  To find the location to but in this 
+        field enter the following command:
+        >>> type chromedriver
+        chromedriver is /opt/homebrew/bin/chromedriver
+	base_url : str, default='https://ncrdb.usga.org/'
+		USGA NCRDB base url. This shouldn't change unless the host changes its base url.
+    driver : webdriver.Chrome, optional
+        Running webdriver from start_driver() to reuse.  If None, a driver is started and quit within this call.  Only used
+        when use_selenium=True.
+    session : requests.Session, optional
+        Session to reuse for the form postback.  If None, the module session is used.
+    use_selenium : bool, default=False
+        False posts the ASP.NET form directly with requests.  True drives the webpage in Chrome instead.
+    form : dict, optional
+        Result of get_postback_form() to reuse across states.  If None, the form is loaded for this state.
 
-    # Get all courses
-    courses = []
-    for tr in courses_tbl.find('tbody').find_all('tr'):
-        # Initialize new course
-        course = {}
+    Returns
+    -------
+    dict of {str: list} or None
+        Column name mapped to the column values of all courses in the listed state or if archive is not None, the new and 
+        different course instances.  None if the state has no courses table.
+    """
+    
+    if use_selenium:
+        # Initiate webdriver if one was not provided, otherwise reset the shared one
+        quit_driver = driver is None
+        if quit_driver:
+            driver = start_driver(driver_loc)
+        else:
+            driver.delete_all_cookies()
 
-        # Find link, course id in row
         try:
-            url_ext = tr.find_all('a', href=True)[0]['href']
-            course_id = re.search(r'CourseID=(\d+)', url_ext).groups()[0]
+            page_source = get_courses_page_selenium(state, driver, base_url=base_url)
+        finally:
+            if quit_driver:
+                driver.quit()
+    else:
+        if session is None:
+            session = _SESSION
+        page_source = get_courses_page(state, session, base_url=base_url, form=form)
 
-            course['url'] = base_url + url_ext
-            course['course_id'] = course_id
+    if page_source is None:
+        return None
 
-        except:
-            # If no url found, set to none
-            course['url'] = None
-            course['course_id'] = None
+    # Get the courses table straight from the lxml tree
+    tree = lxml.html.fromstring(page_source)
+    courses_tbl = tree.get_element_by_id('gvCourses', None)
+    if courses_tbl is None:
+        return None
 
-        # Loop thru each element of row
-        for i, td in enumerate(tr.find_all('td')):
-            course[headers[i+3]] = td.text  # offset by 3 to account for additional headers not in table
+    # Get headers, the table headers are wrapped by course_id in front and url, last_updated at the end
+    tbl_headers = [div.text_content() for div in courses_tbl.xpath('./thead//div')]
+    tbl_headers = [normalize_header(col) for col in tbl_headers]
+    headers = ['course_id'] + tbl_headers + ['url', 'last_updated']
 
-        # Set the updated time
-        course['last_updated'] = datetime.datetime.now()
+    # Build archive lookups so each row is checked in constant time
+    if archive is not None:
+        if isinstance(archive, pd.DataFrame):
+            archive = build_archive_lookup(archive)
+        arch_urls = archive['urls']
+        arch_city_by_id = archive['city_by_id']
+        city_idx = tbl_headers.index('city')
+
+    # Get all courses as fixed-schema row tuples
+    pulled_at = datetime.datetime.now()
+    rows = []
+    for tr in courses_tbl.xpath('./tbody/tr'):
+        # Find link, course id in row. If no url found, set to none
+        url = None
+        course_id = None
+        anchor = tr.find('.//a[@href]')
+        if anchor is not None:
+            url_ext = anchor.get('href')
+            url = base_url + url_ext
+            m = _COURSEID_RE.search(url_ext)
+            course_id = m.group(1) if m else None
+
+        # Get each element of row, padding short rows and trimming long ones so the columns stay aligned
+        cells = [td.text_content() for td in tr.findall('td')]
+        cells = (cells + [None] * (len(tbl_headers) - len(cells)))[:len(tbl_headers)]
 
         # Check if in archive
         if archive is not None:
@@ -135,11 +416,11 @@ def get_courses_by_state(state, archive=None, driver_loc='/opt/homebrew/bin/chro
             #   city: if course_id is found, checks that city of that course_id matches archive
 
             criteria = {}
-            criteria['url'] = archive['url'].eq(base_url + url_ext).any()  # see if url is in archive
-            criteria['course_id'] = archive['course_id'].eq(course_id).any()  # see if course_id is in archive
+            criteria['url'] = url in arch_urls  # see if url is in archive
+            criteria['course_id'] = course_id in arch_city_by_id  # see if course_id is in archive
             if criteria['course_id']:
                 # See if city matches
-                criteria['city'] = archive.loc[archive['course_id'].eq(course_id), 'city'].eq(course['city']).all()
+                criteria['city'] = arch_city_by_id.get(course_id) == cells[city_idx]
             else:
                 criteria['city'] = False
 
@@ -151,31 +432,120 @@ def get_courses_by_state(state, archive=None, driver_loc='/opt/homebrew/bin/chro
             elif 0 < sum(criteria.values()) < len(criteria.values()):
                 # If any are False, keep this row but WARN
                 print(f'WARNING: CourseID {course_id} contains modified data.')
-                courses.append(course)
 
             else:
                 # If all are False, this is new data
                 print(f'INFO: CourseID {course_id} is a new course.')
-                courses.append(course)
-        
-        # No archive was provided
-        else:
-            # Append each course to the courses list
-            courses.append(course)
-
-    # Turn courses into DataFrame, and create course_id column to use as foreign key
-    if len(courses) > 0:
-        courses = pd.DataFrame(courses)
-        courses['url'] = courses.pop('url')
-        courses['last_updated'] = courses.pop('last_updated')
-        return courses
+
+        # Append the course in the order of headers, last_updated is filled in below
+        rows.append((course_id, *cells, url))
+
+    # Transpose the rows into columns in one pass
+    if len(rows) > 0:
+        cols = dict(zip(headers, map(list, zip(*rows))))
     else:
+        cols = {col: [] for col in headers[:-1]}
+
+    # All rows were pulled at once so they share one timestamp
+    cols['last_updated'] = [pulled_at] * len(rows)
+
+    return cols
+
+
+def get_courses_by_state(state, archive=None, driver_loc='/opt/homebrew/bin/chromedriver', base_url='https://ncrdb.usga.org/',
+                         driver=None, session=None, use_selenium=False, form=None):
+    """Get a DataFrame of all the courses in the provided state.  
+    
+    Parameters
+    ----------
+    state : str
+        The State/Province that will the courses will be pulled from.  Be sure that the inputted state exists in the get_states()
+        function.
+    archive : pd.DataFrame, optional
+        If this is an incremental pull, input the DataFrame from the last pull to see what the changes are.
+    driver_loc : str, default='/opt/homebrew/bin/chromedriver'
+        The local location of your Chrome Driver.  Only used when use_selenium=True.  To find the location to but in this 
+        field enter the following command:
+        >>> type chromedriver
+        chromedriver is /opt/homebrew/bin/chromedriver
+	base_url : str, default='https://ncrdb.usga.org/'
+		USGA NCRDB base url. This shouldn't change unless the host changes its base url.
+    driver : webdriver.Chrome, optional
+        Running webdriver from start_driver() to reuse.  If None, a driver is started and quit within this call.  Only used
+        when use_selenium=True.
+    session : requests.Session, optional
+        Session to reuse for the form postback.  If None, the module session is used.
+    use_selenium : bool, default=False
+        False posts the ASP.NET form directly with requests.  True drives the webpage in Chrome instead.
+    form : dict, optional
+        Result of get_postback_form() to reuse across states.  If None, the form is loaded for this state.
+
+    Returns
+    -------
+    pd.DataFrame
+        Containing all courses in the listed state or if archive is not None, returns the new and different course instances.
+    """
+
+    cols = get_course_columns_by_state(state=state,
+                                       archive=archive,
+                                       driver_loc=driver_loc,
+                                       base_url=base_url,
+                                       driver=driver,
+                                       session=session,
+                                       use_selenium=use_selenium,
+                                       form=form)
+    if cols is None:
+        return None
+
+    # Turn courses into DataFrame, course_id column is used as foreign key
+    if len(cols['course_id']) == 0:
         print('INFO: No new data is present, returning empty DataFrame.')
-        return pd.DataFrame(columns=headers)
+    return pd.DataFrame(cols, copy=False)
+
+
+def load_state_cache(cache_file):
+    """Load the per-state cache written by store_state_cache().
+
+    Parameters
+    ----------
+    cache_file : str
+        Location of the json cache file.
+
+    Returns
+    -------
+    dict
+        State name mapped to {'etag', 'last_modified', 'fetched_at', 'rows_hash', 'courses'}.  Empty if no cache exists.
+    """
+    try:
+        with open(cache_file) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def store_state_cache(cache, cache_file):
+    """Store the per-state cache used by get_courses() as json.
+
+    Parameters
+    ----------
+    cache : dict
+        State name mapped to {'etag', 'last_modified', 'fetched_at', 'rows_hash', 'courses'}.
+    cache_file : str
+        Location of the json cache file.
+    """
+    with open(cache_file, 'w+') as f:
+        json.dump(cache, f)
+
+
+def hash_courses(cols):
+    """Get a stable hash of the columns returned by get_course_columns_by_state(), ignoring the last_updated column."""
+    data = json.dumps({col: values for col, values in cols.items() if col != 'last_updated'})
+    return hashlib.sha1(data.encode()).hexdigest()
 
 
 # Combine all courses in one DataFrame
-def get_courses(states, archive=None, driver_loc='/opt/homebrew/bin/chromedriver', base_url='https://ncrdb.usga.org/'):
+def get_courses(states, archive=None, driver_loc='/opt/homebrew/bin/chromedriver', base_url='https://ncrdb.usga.org/',
+                use_selenium=False, max_workers=8, cache_file=None, min_interval=1):
     """Get a DataFrame of all the courses in the provided states.  
     
     Parameters
@@ -186,11 +556,24 @@ def get_courses(states, archive=None, driver_loc='/opt/homebrew/bin/chromedriver
     archive : pd.DataFrame, optional
         If this is an incremental pull, input the DataFrame from the last pull to see what the changes are.
     driver_loc : str, default='/opt/homebrew/bin/chromedriver'
-        The local location of your Chrome Driver.  To find the location to but in this field enter the following command:
+        The local location of your Chrome Driver.  Only used when use_selenium=True.  To find the location to but in this 
+        field enter the following command:
         >>> type chromedriver
         chromedriver is /opt/homebrew/bin/chromedriver
 	base_url : str, default='https://ncrdb.usga.org/'
 		USGA NCRDB base url. This shouldn't change unless the host changes its base url.
+    use_selenium : bool, default=False
+        False posts the ASP.NET form directly with requests.  True drives the webpage in Chrome instead.
+    max_workers : int, default=8
+        Number of states pulled concurrently.  With use_selenium=True each worker runs its own browser.
+    cache_file : str, optional
+        Location of a json cache of the last pull of each state, e.g. 'data/.state_cache.json'.  Cached pulls newer than 
+        COURSES_CACHE_TTL are reused instead of pulling the state again, unless the webpage returns a different 
+        ETag/Last-Modified than the cached pull.  The validators belong to the landing page, not the state results, so they 
+        are only a coarse hint and the TTL bounds how stale a state can get.  The cache is only used when archive is None.
+    min_interval : float, default=1
+        Minimum seconds between the start of two state pulls, shared across all workers.  Pulls that take longer than this
+        are not followed by any extra wait.
 
     Returns
     -------
@@ -198,73 +581,302 @@ def get_courses(states, archive=None, driver_loc='/opt/homebrew/bin/chromedriver
         Containing all courses in the listed states or if archive is not None, returns the new and different course instances.
     """
 
-    # Loop thru the states and combine dataframes
-    course_list = []
-    for state in states:
-        # Pull data from the state
-        courses = get_courses_by_state(state=state, 
-                                       archive=archive,
-                                       driver_loc=driver_loc,
-                                       base_url=base_url)
-        if courses is not None:
-            course_list.append(courses)
+    # Share one session across all workers, Selenium drivers are not thread-safe so each worker gets its own
+    session = create_session(pool_size=max(max_workers, 32))
+    local = threading.local()
+    drivers = []
+    drivers_lock = threading.Lock()
+
+    # Check the webpage validators once, a cached state is not reused if the page sent validators that changed since
+    # it was cached.  The check is optional so any failure leaves the TTL to decide
+    cache = None
+    validators = {'etag': None, 'last_modified': None}
+    if cache_file is not None and archive is None:
+        cache = load_state_cache(cache_file)
+        try:
+            head = session.head(base_url, timeout=REQUEST_TIMEOUT)
+            head.raise_for_status()
+        except requests.RequestException as e:
+            print(f'WARNING: Unable to check {base_url} for changes, cached states are reused until they expire. {e}')
         else:
+            validators = {'etag': head.headers.get('ETag'), 'last_modified': head.headers.get('Last-Modified')}
+
+    # Build the archive lookups and load the postback form once for all states
+    archive_lookup = build_archive_lookup(archive) if archive is not None else None
+    form = get_postback_form(session, base_url) if not use_selenium else None
+
+    # States served from the cache, these keep their cached fetched_at
+    reused = set()
+
+    # Space the pulls out across all workers, only waiting for whatever is left of min_interval
+    pace_lock = threading.Lock()
+    next_pull = [time.monotonic()]
+
+    def wait_for_turn():
+        with pace_lock:
+            now = time.monotonic()
+            start = max(now, next_pull[0])
+            next_pull[0] = start + min_interval
+        time.sleep(start - now)
+
+    def get_driver():
+        if getattr(local, 'driver', None) is None:
+            local.driver = start_driver(driver_loc)
+            with drivers_lock:
+                drivers.append(local.driver)
+        return local.driver
+
+    def pull_state(state):
+        # Reuse the cached courses if the cached pull is not too old and the webpage has not changed
+        entry = cache.get(state) if cache is not None else None
+        if entry is not None and 'fetched_at' in entry and \
+                datetime.datetime.now() - datetime.datetime.fromisoformat(entry['fetched_at']) < COURSES_CACHE_TTL and \
+                all(value is None or entry.get(key) == value for key, value in validators.items()):
+            cols = {col: list(values) for col, values in entry['courses'].items()}
+            cols['last_updated'] = [datetime.datetime.fromisoformat(ts) for ts in cols['last_updated']]
+            reused.add(state)
+            return cols
+
+        driver = get_driver() if use_selenium else None
+        wait_for_turn()
+        try:
+            cols = get_course_columns_by_state(state=state, 
+                                               archive=archive_lookup,
+                                               driver_loc=driver_loc,
+                                               base_url=base_url,
+                                               driver=driver,
+                                               session=session,
+                                               use_selenium=use_selenium,
+                                               form=form)
+        except WebDriverException:
+            # Browser session died, restart it and retry this state once
+            print(f'WARNING: Chrome session lost while pulling {state}, restarting the driver.')
+            try:
+                driver.quit()
+            except WebDriverException:
+                pass
+            local.driver = None
+            cols = get_course_columns_by_state(state=state, 
+                                               archive=archive_lookup,
+                                               driver_loc=driver_loc,
+                                               base_url=base_url,
+                                               driver=get_driver(),
+                                               session=session,
+                                               use_selenium=use_selenium,
+                                               form=form)
+
+        if cols is None:
             print(f'WARNING: {state} contains no courses.')
 
-        # Wait between pulls
-        time.sleep(3)
+        return cols
+
+    # Pull the states concurrently, keeping the order of states
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pulled = list(executor.map(pull_state, states))
+    finally:
+        session.close()
+        for driver in drivers:
+            try:
+                driver.quit()
+            except WebDriverException:
+                pass
+
+    # Update the cache for every state that was pulled, the cached rows are only rewritten when the courses changed
+    if cache is not None and not reused.issuperset(states):
+        fetched_at = datetime.datetime.now().isoformat()
+        for state, state_cols in zip(states, pulled):
+            if state_cols is None or state in reused:
+                continue
+            entry = cache.get(state, {})
+            rows_hash = hash_courses(state_cols)
+            if entry.get('rows_hash') != rows_hash:
+                entry['rows_hash'] = rows_hash
+                entry['courses'] = dict(state_cols, last_updated=[ts.isoformat() for ts in state_cols['last_updated']])
+            entry['fetched_at'] = fetched_at
+            entry['etag'] = validators['etag']
+            entry['last_modified'] = validators['last_modified']
+            cache[state] = entry
+        store_state_cache(cache, cache_file)
+
+    # Extend one set of columns across all states and build the dataframe once
+    cols = {}
+    for state_cols in pulled:
+        if state_cols is None:
+            continue
+        for col, values in state_cols.items():
+            cols.setdefault(col, []).extend(values)
 
-    # Return the concatenated dataframe
-    return pd.concat(course_list)
+    return pd.DataFrame(cols, copy=False)
 
 
-def get_course_details(url, course_id):
+def get_course_details(url, course_id, force_refresh=False, unchanged=None, data_folder='data'):
     """Read the course tee details for the provided url.
     
     Parameters
     ----------
     url : str
         USGA NCRDB website url to pull tee data.
+    force_refresh : bool, default=False
+        True ignores any cached response for the url so the page is pulled from the host.
+    unchanged : pd.DataFrame, optional
+        Tee details from an earlier pull.  If the page is served from the response cache, either because it is still fresh
+        or because the host answered the conditional request with 304 Not Modified, this is returned without parsing the page.
+    data_folder : str, default='data'
+        Directory that the response cache is stored in.
     
     Returns
     -------
     """
 
-    page = requests.get(url)
-    soup = BeautifulSoup(page.content, 'html.parser')
+    page = get_course_page(url, force_refresh=force_refresh, data_folder=data_folder)
+    return read_course_details(page, course_id, unchanged=unchanged)
+
+
+def get_course_page(url, force_refresh=False, data_folder='data'):
+    """Get the course page response for the provided url through the response cache.
+
+    Parameters
+    ----------
+    url : str
+        USGA NCRDB website url to pull tee data.
+    force_refresh : bool, default=False
+        True ignores any cached response for the url so the page is pulled from the host.
+    data_folder : str, default='data'
+        Directory that the response cache is stored in.
+
+    Returns
+    -------
+    requests.Response
+        Response of the page, from_cache is True if the host was not hit or answered 304 Not Modified.
+    """
+    page = get_cached_session(data_folder).get(url, timeout=REQUEST_TIMEOUT, force_refresh=force_refresh)
+    page.raise_for_status()
+    return page
+
+
+def read_course_details(page, course_id, unchanged=None):
+    """Read the course tee details out of a get_course_page() response, see get_course_details()."""
+    if unchanged is not None and getattr(page, 'from_cache', False):
+        return unchanged
+
+    return parse_course_details(page.content, course_id)
+
+
+async def get_course_details_async(session, semaphore, url, course_id, sleep=1):
+    """Read the course tee details for the provided url on an asyncio event loop.
+
+    Parameters
+    ----------
+    session : aiohttp.ClientSession
+        Session shared by all course fetches.
+    semaphore : asyncio.Semaphore
+        Bounds the number of concurrent hits on the host.
+    url : str
+        USGA NCRDB website url to pull tee data.
+    course_id : str
+        Course id of the url.
+    sleep : int, default=1
+        Sleep time after each website hit, while holding the semaphore.
+
+    Returns
+    -------
+    pd.DataFrame or None
+        Same as get_course_details().
+    """
+    async with semaphore:
+        async with session.get(url) as page:
+            page.raise_for_status()
+            content = await page.read()
+
+        # Wait between hits, jittered in 100ms steps so the tasks don't hit the host in lockstep
+        await asyncio.sleep(sleep + 0.1 * random.randint(0, 5))
+
+    # Parse off the event loop so other fetches keep going
+    return await asyncio.get_running_loop().run_in_executor(None, parse_course_details, content, course_id)
+
+
+async def get_all_course_details_async(pairs, max_workers=64, sleep=1, callback=None):
+    """Read the course tee details for all (url, course_id) pairs concurrently on one asyncio event loop.
+
+    Parameters
+    ----------
+    pairs : list of (url, course_id)
+        Courses to fetch.
+    max_workers : int, default=64
+        Number of concurrent hits on the host.
+    sleep : int, default=1
+        Sleep time after each website hit.
+    callback : callable, optional
+        Called with the course_id after each course finishes, e.g. to update a progress bar.
+
+    Returns
+    -------
+    list of pd.DataFrame, None or Exception
+        Result of each pair in the order of pairs.  Failed fetches return their exception.
+    """
+    semaphore = asyncio.Semaphore(max_workers)
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+
+    async def fetch(session, url, course_id):
+        try:
+            return await get_course_details_async(session, semaphore, url, course_id, sleep=sleep)
+        finally:
+            if callback is not None:
+                callback(course_id)
+
+    connector = aiohttp.TCPConnector(limit=max_workers)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        return await asyncio.gather(*[fetch(session, url, course_id) for url, course_id in pairs], return_exceptions=True)
+
+
+def parse_course_details(content, course_id):
+    """Parse the course tee details out of a course page.
+
+    Parameters
+    ----------
+    content : bytes or str
+        Html of the USGA NCRDB course page.
+    course_id : str
+        Course id of the page, added as a column.
+
+    Returns
+    -------
+    pd.DataFrame or None
+        Tee details of the course, None if the page has no tee table.
+    """
+    tree = lxml.html.fromstring(content)
 
     # Get table
     tbl_id = 'gvTee'
-    tee_table = soup.find(attrs={'id': tbl_id})
+    tee_table = tree.get_element_by_id(tbl_id, None)
 
     # If no table exists
     if tee_table is None:
         return None
 
-    # Initialize course deets and loop thru
-    course_deets = []
-    for i, tr in enumerate(tee_table.find_all('tr')):
+    # Get the header from the first row
+    header = [_TEE_HEADER_RE.sub('', _WS_RE.sub('_', th.text_content().lower())).strip('_')
+              for th in tee_table.xpath('(.//tr)[1]//th')]
 
-        # Handle the header
-        if i==0:
-            header = [re.sub(r'[^A-Za-z0-9\._/]+', '', re.sub(r'\s+', '_', th.text.lower())).strip('_') for th in tr.find_all('th')]
-            header += ['course_id']
-            continue
+    if len(header) == 0:
+        raise ValueError(f'CourseID {course_id} tee table has no header.')
 
-        # Loop thru each column
-        course_tee = [re.sub(r'[^A-Za-z0-9\./]+', '', td.text.lower()) for td in tr.find_all('td')] + [course_id]
-            
-        # apppend tee to course_deets
-        course_deets.append(course_tee)
+    # Get the cells of each remaining row, padding short rows and trimming long ones so the columns stay aligned
+    course_deets = []
+    for tr in tee_table.xpath('(.//tr)[position()>1]'):
+        cells = [_TEE_CELL_RE.sub('', td.text_content().lower()) for td in tr.xpath('.//td')]
+        course_deets.append((cells + [None] * (len(header) - len(cells)))[:len(header)])
 
     # Create dataframe and clean
     df = pd.DataFrame(course_deets, columns=header).drop(['', 'ch'], axis=1)
-    df.insert(0, 'course_id', df.pop('course_id'))
+    df.insert(0, 'course_id', course_id)
     
     return df
 
 
-def get_course_details_all(courses, existing_data=None, update=False, sleep=1, progress_bar=True):
+def get_course_details_all(courses, existing_data=None, update=False, sleep=1, progress_bar=True, max_workers=16,
+                           force_refresh=False, backend='threads', data_folder='data'):
     """Loop thru all courses from get_courses() or restore_courses().
 
     Parameters
@@ -274,11 +886,21 @@ def get_course_details_all(courses, existing_data=None, update=False, sleep=1, p
     existing_data : pd.DataFrame, optional
         If a partial list or full list already exists, include it here. 
     update : bool, default=False
-        TODO: False will ignore course ids that already exist.  True will look for changes to the existing courses.
+        False will ignore course ids that already exist.  True will look for changes to the existing courses, pages the host
+        reports as not modified are not parsed again.
     sleep : int
-        Sleep time in between website hits.
+        Sleep time in between website hits for each worker.
     progress_bar : bool, default=True
         Whether or not to show the progress bar. True is recommended.
+    max_workers : int, default=16
+        Number of course pages fetched concurrently.
+    force_refresh : bool, default=False
+        True ignores the response cache and pulls every course page from the host.
+    backend : {'threads', 'async'}, default='threads'
+        'threads' fetches with a thread pool through the response cache.  'async' fetches with aiohttp on one event loop,
+        which scales to more concurrent hits but bypasses the response cache.
+    data_folder : str, default='data'
+        Directory that the response cache is stored in.
 
     Returns
     -------
@@ -290,75 +912,166 @@ def get_course_details_all(courses, existing_data=None, update=False, sleep=1, p
         'skipped_courses' : DataFrame of courses that were skipped not out of error
     """
 
-    # Get list of existing course_ids from existing_data
-    exclude_course_ids = []
+    # Get set of existing course_ids from existing_data.  Restored files read the course ids back as ints while pulled
+    # course ids are str, so the existing course ids are made str to match
+    exclude_course_ids = set()
+    existing_by_id = {}
     if existing_data is not None:
-        exclude_course_ids = existing_data['course_id'].unique().tolist()
-    
-    # Loop thru courses to get course details
-    names = ['all_courses', 'new_courses', 'failed_courses', 'modified_courses', 'skipped_courses']
-    all_courses = []
-    new_courses = []
-    failed_courses = []
-    modified_courses = []
-    skipped_courses = []
-    for i, row in courses.iterrows():
-        # Print status
-        if progress_bar:
-            printProgressBar(i, len(courses), prefix=f"Processing {row['course_id']}")
-
-        # Check if this course is in exclude_course_ids
-        if row['course_id'] in exclude_course_ids:
-            skipped_courses.append(row)
-            all_courses.append(existing_data[existing_data['course_id']==row['course_id']])
-            continue
+        existing_course_ids = existing_data['course_id'].astype(str)
+        existing_data = existing_data.assign(course_id=existing_course_ids)
+        exclude_course_ids = set(existing_course_ids.unique())
+        existing_by_id = {course_id: tees for course_id, tees in existing_data.groupby(existing_course_ids, sort=False)}
+
+    # Open the response cache before the workers start so they share one session
+    if backend == 'threads':
+        get_cached_session(data_folder)
+
+    # Check which courses are in exclude_course_ids, the rest are fetched
+    results = [None] * len(courses)
+    to_fetch = []
+    course_rows = courses[['url', 'course_id']].astype({'course_id': str})
+    for pos, (url, course_id) in enumerate(course_rows.itertuples(index=False, name=None)):
+        if course_id in exclude_course_ids and not update:
+            results[pos] = ('existing', course_id)
+        else:
+            to_fetch.append((pos, url, course_id))
 
-        # Get course details
+    def fetch(url, course_id):
+        # Existing courses are only parsed again if the page changed
+        existing = existing_by_id.get(course_id)
+
+        page = None
         try:
-            tees = get_course_details(row['url'], row['course_id'])
-        except:
-            failed_courses.append(row)
-            continue
+            page = get_course_page(url, force_refresh=force_refresh, data_folder=data_folder)
+            return read_course_details(page, course_id, unchanged=existing), existing
+        finally:
+            # Wait between hits, jittered in 100ms steps so the workers don't hit the host in lockstep.  Pages served from
+            # the response cache didn't hit the host, so there is no need to wait after them
+            if page is None or not getattr(page, 'from_cache', False):
+                time.sleep(sleep + 0.1 * random.randint(0, 5))
+
+    def as_text(value):
+        # Missing cells read back from files as NaN/<NA> while parsed cells are '' or None, compare them all as ''.  read_csv
+        # makes a column with any blank cell float, so numbers are compared as floats, e.g. a parsed '72' matches 72.0
+        if pd.isna(value):
+            return ''
+        try:
+            return str(float(value))
+        except (TypeError, ValueError):
+            return str(value)
 
-        # Append data
+    def as_table(tees):
+        return tees.astype(object).applymap(as_text).reset_index(drop=True)
+
+    def classify(course_id, tees, existing):
         if tees is None:
-            skipped_courses.append(row)
-        # TODO: add check for modified courses
+            return ('skipped', course_id)
+        elif existing is None:
+            return ('new', tees)
+        elif tees is existing or as_table(tees).equals(as_table(existing)):
+            return ('existing', course_id)
+        else:
+            return ('modified', tees)
+
+    # Print status, tqdm throttles the redraws and is safe to update from the workers
+    pbar = tqdm(total=len(courses), initial=len(courses) - len(to_fetch), disable=not progress_bar, desc='courses')
+
+    def report(course_id):
+        pbar.update(1)
+
+    # Get course details concurrently
+    if backend == 'threads':
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(fetch, url, course_id): (pos, course_id) for pos, url, course_id in to_fetch}
+            for future in as_completed(futures):
+                pos, course_id = futures[future]
+                try:
+                    tees, existing = future.result()
+                except Exception:
+                    results[pos] = ('failed', course_id)
+                else:
+                    results[pos] = classify(course_id, tees, existing)
+                report(course_id)
+
+    elif backend == 'async':
+        # Jupyter already runs an event loop, so the fetches get their own loop in a separate thread there
+        pairs = [(url, course_id) for _, url, course_id in to_fetch]
+        coro = get_all_course_details_async(pairs, max_workers=max_workers, sleep=sleep, callback=report)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            fetched = asyncio.run(coro)
         else:
-            all_courses.append(tees)
-            new_courses.append(tees)
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                fetched = executor.submit(asyncio.run, coro).result()
+        for (pos, _, course_id), tees in zip(to_fetch, fetched):
+            if isinstance(tees, Exception):
+                results[pos] = ('failed', course_id)
+            else:
+                results[pos] = classify(course_id, tees, existing_by_id.get(course_id))
 
-        # Wait between hits
-        time.sleep(sleep)
+    else:
+        pbar.close()
+        raise NameError(f'backend=[{backend}] which is not a valid name.')
 
     # Finalize progress bar
-    if progress_bar:
-        printProgressBar(len(courses), len(courses), prefix=f"COMPLETED")
+    pbar.close()
+
+    # Sort the results in the order of courses, the course rows are only materialized for failed and skipped courses
+    names = ['all_courses', 'new_courses', 'failed_courses', 'modified_courses', 'skipped_courses']
+    all_courses = []
+    new_courses = []
+    failed_courses = []
+    modified_courses = []
+    skipped_courses = []
+    existing_ids = []
+    for pos, (status, data) in enumerate(results):
+        if status == 'existing':
+            skipped_courses.append(courses.iloc[pos].to_dict())
+            existing_ids.append(data)
+        elif status == 'failed':
+            failed_courses.append(courses.iloc[pos].to_dict())
+        elif status == 'skipped':
+            skipped_courses.append(courses.iloc[pos].to_dict())
+        elif status == 'modified':
+            all_courses.append(data)
+            modified_courses.append(data)
+        else:
+            all_courses.append(data)
+            new_courses.append(data)
+
+    # Existing courses are kept with a single slice in front of the pulled courses
+    if len(existing_ids) > 0:
+        all_courses.insert(0, existing_data[existing_course_ids.isin(existing_ids)])
 
     # Once done iterating convert all dataframe lists into dataframes
     out_dict = {}
     for ls, name in zip([all_courses, new_courses, failed_courses, modified_courses, skipped_courses], names):
         if len(ls) == 0:
             out_dict[name] = None
+        elif name in ('failed_courses', 'skipped_courses'):
+            out_dict[name] = pd.DataFrame(ls)
         else:
-            out_dict[name] = pd.concat(ls).reset_index(drop=True)
+            out_dict[name] = pd.concat(ls, ignore_index=True, copy=False)
 
     return out_dict
 
 
 def clean_courses(courses):
     """Clean the DataFrame returned from get_courses() or restore_courses()."""
-    df = courses.copy()
+    # Arrow backed strings let str.title() run on Arrow's utf8 kernels, this also copies courses
+    title_cols = ['club_name', 'course_name', 'city']
+    df = courses.astype({col: 'string[pyarrow]' for col in title_cols})
 
     # Utilize title case structure
-    for col in ['club_name', 'course_name', 'city']:
+    for col in title_cols:
         df[col] = df[col].str.title()
 
     return df
 
 
-def store_course_details(dfs, data_folder='data'):
-    """Store the get_course_details_all()['all_courses'] dataframe as a csv.
+def store_course_details(dfs, data_folder='data', file_format='parquet'):
+    """Store the get_course_details_all() dataframes as csv or parquet files.
 
     Parameters
     ----------
@@ -371,23 +1084,49 @@ def store_course_details(dfs, data_folder='data'):
         'skipped_courses' : DataFrame of courses that were skipped not out of error
     data_folder : str
         Directory that the data is to be stored in.
+    file_format : {'parquet', 'csv'}, default='parquet'
+        Format of the stored files.  Parquet is compressed with zstd and keeps the column dtypes.
     """
+    if file_format not in ('csv', 'parquet'):
+        raise NameError(f'file_format=[{file_format}] which is not a valid name.')
+
     # Rewrite to make each dataframe a file
-    filenames = [os.path.join(data_folder, f'all_course_details_{get_date()}.csv'),
-                 os.path.join(data_folder, f'new_course_details_{get_date()}.csv'),
-                 os.path.join(data_folder, f'failed_course_details_{get_date()}.csv'),
-                 os.path.join(data_folder, f'modified_course_details_{get_date()}.csv'),
-                 os.path.join(data_folder, f'skipped_course_details_{get_date()}.csv')]
+    filenames = [os.path.join(data_folder, f'all_course_details_{get_date()}.{file_format}'),
+                 os.path.join(data_folder, f'new_course_details_{get_date()}.{file_format}'),
+                 os.path.join(data_folder, f'failed_course_details_{get_date()}.{file_format}'),
+                 os.path.join(data_folder, f'modified_course_details_{get_date()}.{file_format}'),
+                 os.path.join(data_folder, f'skipped_course_details_{get_date()}.{file_format}')]
 
     keys = ['all_courses', 'new_courses', 'failed_courses', 'modified_courses', 'skipped_courses']
 
     for key, filename in zip(keys, filenames):
         df = dfs[key]
 
-        # If none, write an empty file
+        # If none, write an empty file.  Parquet files get an empty table so they stay readable by any parquet reader
         if df is None:
-            with open(filename, 'w+') as f:
-                f.write('')
+            if file_format == 'parquet':
+                pq.write_table(pa.table({}), filename)
+            else:
+                with open(filename, 'w+') as f:
+                    f.write('')
+            print(f'INFO: Successfully wrote the course details dataframe to {filename}')
+            continue
+
+        # Write with Arrow's vectorized writers.  Columns mixing types (e.g. int course ids next to str course ids) can't 
+        # be converted to Arrow, parquet casts only those columns to str keeping the missing values and csv falls back to 
+        # pandas
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            table = None
+
+        if file_format == 'parquet':
+            if table is None:
+                mixed = [col for col in df.columns if df[col].dtype == object and df[col].dropna().map(type).nunique() > 1]
+                table = pa.Table.from_pandas(df.astype({col: 'string' for col in mixed}), preserve_index=False)
+            pq.write_table(table, filename, compression='zstd')
+        elif table is not None:
+            pyarrow.csv.write_csv(table, filename)
         else:
             df.to_csv(filename, index=False)
 
@@ -395,7 +1134,7 @@ def store_course_details(dfs, data_folder='data'):
 
 
 def restore_course_details(data=None, dates=None, data_folder='data'):
-    """Restore the get_course_details_all() dataframe from csv.
+    """Restore the get_course_details_all() dataframes from the parquet files, or the csv files if no parquet file exists.
 
     Parameters
     ----------
@@ -419,11 +1158,11 @@ def restore_course_details(data=None, dates=None, data_folder='data'):
         'skipped_courses' : DataFrame of courses that were skipped not out of error
     """
     # Create file_mapping
-    fmap = {'all_courses': 'all_course_details_{}.csv', 
-            'new_courses': 'new_course_details_{}.csv', 
-            'failed_courses': 'failed_course_details_{}.csv', 
-            'modified_courses': 'modified_course_details_{}.csv', 
-            'skipped_courses': 'skipped_course_details_{}.csv'}
+    fmap = {'all_courses': 'all_course_details_{}', 
+            'new_courses': 'new_course_details_{}', 
+            'failed_courses': 'failed_course_details_{}', 
+            'modified_courses': 'modified_course_details_{}', 
+            'skipped_courses': 'skipped_course_details_{}'}
 
     # Make data a list
     if data is None:
@@ -445,12 +1184,18 @@ def restore_course_details(data=None, dates=None, data_folder='data'):
     else:
         raise LookupError('Unable to match up date input with data')
 
-    # Read files
+    # Read files, falling back to csv files stored before parquet was the default
     dfs = {}
     for key, date in zip(data, dates):
         filename = os.path.join(data_folder, fmap[key].format(date))
         try:
-            df = pd.read_csv(filename)
+            if os.path.exists(f'{filename}.parquet'):
+                # The empty table written for a None dataframe is restored as None
+                df = read_parquet(f'{filename}.parquet')
+                if len(df.columns) == 0:
+                    df = None
+            else:
+                df = pd.read_csv(f'{filename}.csv')
         except:
             df = None
         dfs[key] = df
@@ -459,8 +1204,8 @@ def restore_course_details(data=None, dates=None, data_folder='data'):
 
 
 # Store the dataframe
-def store_courses(df, data_folder='data'):
-    """Store the get_courses() dataframe as a csv.
+def store_courses(df, data_folder='data', file_format='parquet'):
+    """Store the get_courses() dataframe as a parquet or csv file.
 
     Parameters
     ----------
@@ -468,16 +1213,24 @@ def store_courses(df, data_folder='data'):
         Course DataFrame to be saved.
     data_folder : str
         Directory that the data is to be stored in.
+    file_format : {'parquet', 'csv'}, default='parquet'
+        Format of the stored file.  Parquet is compressed with zstd and keeps the column dtypes.
     """
     # Set filename
-    file = os.path.join(data_folder, f'courses_{get_date()}.csv')
+    file = os.path.join(data_folder, f'courses_{get_date()}.{file_format}')
+
+    if file_format == 'parquet':
+        df.to_parquet(file, compression='zstd', index=False)
+    elif file_format == 'csv':
+        df.to_csv(file, index=False)
+    else:
+        raise NameError(f'file_format=[{file_format}] which is not a valid name.')
 
-    df.to_csv(file, index=False)
     print(f'INFO: Successfully wrote the courses dataframe to {file}')
 
 
 def restore_courses(date=None, data_folder='data'):
-    """Restore get_courses() dataframe from the csv.
+    """Restore get_courses() dataframe from the parquet file, or the csv if no parquet file exists.
     
     Parameters
     ----------
@@ -492,9 +1245,24 @@ def restore_courses(date=None, data_folder='data'):
         Containing all courses retrieved from the get_courses() function.
     """
 
-    # Set filename
-    filename = os.path.join(data_folder, f'courses_{get_date(date)}.csv')
-    return pd.read_csv(filename)
+    # Set filename, falling back to csv files stored before parquet was the default
+    filename = os.path.join(data_folder, f'courses_{get_date(date)}.parquet')
+    if os.path.exists(filename):
+        return read_parquet(filename)
+
+    return pd.read_csv(os.path.join(data_folder, f'courses_{get_date(date)}.csv'))
+
+
+def read_parquet(filename):
+    """Read a parquet file into a DataFrame, string columns stay Arrow backed as 'string[pyarrow]' and the rest are numpy."""
+    return pq.read_table(filename).to_pandas(types_mapper=_arrow_string_dtype)
+
+
+def _arrow_string_dtype(arrow_type):
+    """Map Arrow string types to 'string[pyarrow]' for Table.to_pandas(), other types keep the default conversion."""
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return pd.StringDtype('pyarrow')
+    return None
 
 
 def get_date(date=None):